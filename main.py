@@ -1,9 +1,27 @@
 import csv
-import re
-from typing import Dict, List, Optional, Tuple, Union
-
-DATE_PATTERN = re.compile(r"\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])")
-AMOUNT_PATTERN = re.compile(r"^\d+$")
+import mmap
+import os
+import weakref
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fastcsv as _csv
+except ImportError:
+    _csv = csv
+
+try:
+    import re2 as re_engine
+except ImportError:
+    import re as re_engine
+
+DATE_PATTERN = re_engine.compile(
+    r"\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])"
+)
+AMOUNT_PATTERN = re_engine.compile(r"\d+")
+_date_fullmatch = DATE_PATTERN.fullmatch
+_amount_fullmatch = AMOUNT_PATTERN.fullmatch
+SEARCH_COLUMNS = {"date": 0, "category": 1, "amount": 2}
 
 
 def request_command_number(num_commands: int) -> Optional[int]:
@@ -23,7 +41,7 @@ def request_command_number(num_commands: int) -> Optional[int]:
         command_number = int(
             input(f"Введите номер команды (от 1 до {num_commands}): ")
         )
-        if command_number not in range(1, num_commands + 1):
+        if not 1 <= command_number <= num_commands:
             raise ValueError("Ошибка: Введен некорректный номер команды!")
         return command_number
     except ValueError:
@@ -46,12 +64,14 @@ class Transaction:
     Атрибуты:
         date (str): Дата транзакции в формате "гггг-мм-дд".
         category (str): Категория транзакции (например, "Расход" или "Доход").
-        amount (float): Сумма транзакции.
+        amount (int): Сумма транзакции в рублях.
         description (str): Описание транзакции.
     """
 
+    __slots__ = ("date", "category", "amount", "description")
+
     def __init__(
-        self, date: str, category: str, amount: float, description: str
+        self, date: str, category: str, amount: int, description: str
     ) -> None:
         self.date = date
         self.category = category
@@ -64,22 +84,127 @@ class AccountManager:
 
     Атрибуты:
         filename (str): Имя файла, в котором хранятся данные о транзакциях.
+        batch_size (int): Сколько новых транзакций копить в памяти
+            перед записью в файл. По умолчанию 1 - каждая транзакция
+            записывается сразу.
     """
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, batch_size: int = 1) -> None:
         self.filename = filename
+        self.batch_size = batch_size
+        self._pending: List[List[str]] = []
+        self._cache: Optional[List[Tuple[str, ...]]] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._offsets: Optional[List[int]] = None
+        self._totals: Optional[
+            Tuple[
+                List[Tuple[str, ...]],
+                int,
+                List[Tuple[str, ...]],
+                int,
+                int,
+            ]
+        ] = None
+        self._totals_stamp: Optional[Tuple[int, int]] = None
+        self._date_index: Optional[Tuple[List[str], List[int]]] = None
+        self._date_index_stamp: Optional[Tuple[int, int]] = None
+        self._scanned_stamp: Optional[Tuple[int, int]] = None
+        self._pred_cache: Dict[
+            Tuple[int, ...],
+            Callable[..., Callable[[Tuple[str, ...]], bool]],
+        ] = {}
+        if batch_size > 1:
+            weakref.finalize(
+                self, self._write_pending, self.filename, self._pending
+            )
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        """Возвращает время последнего изменения и размер файла с данными."""
+        stat = os.stat(self.filename)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _is_cache_fresh(self) -> bool:
+        """Проверяет, соответствует ли кеш текущему содержимому файла."""
+        return (
+            self._cache is not None
+            and os.path.exists(self.filename)
+            and self._file_stamp() == self._stamp
+        )
+
+    @staticmethod
+    def _escape(value: Optional[Union[str, float]]) -> str:
+        """Готовит значение поля для записи в CSV-файл.
 
-    def load_transactions(self) -> List[List[Union[str, float]]]:
+        Как и csv.writer, записывает None пустым полем, а значения
+        с запятой, кавычкой или переводом строки заключает в кавычки,
+        удваивая кавычки внутри.
+        """
+        if value is None:
+            return ""
+        value = str(value)
+        if any(char in value for char in ',"\r\n'):
+            return '"' + value.replace('"', '""') + '"'
+        return value
+
+    @classmethod
+    def _serialize_row(
+        cls, row: List[Union[str, float]], lineterminator: str = "\r\n"
+    ) -> bytes:
+        """Возвращает строку CSV-файла для транзакции в виде байтов."""
+        line = ",".join(map(cls._escape, row))
+        return (line + lineterminator).encode("utf-8")
+
+    def load_transactions(self) -> List[Tuple[str, ...]]:
         """Загрузка данных о транзакциях из файла.
-        Возвращает cписок списков с данными о транзакциях.
+        Возвращает cписок кортежей с данными о транзакциях.
+
+        Кортежи берутся из кеша без копирования: они неизменяемы,
+        поэтому изменить через них закешированные данные нельзя.
+        """
+        return list(self._load_rows())
+
+    def _load_rows(self) -> List[Tuple[str, ...]]:
+        """Возвращает закешированный список транзакций.
+
+        Файл перечитывается только если он изменился с момента
+        последней загрузки, иначе возвращается закешированный список.
+        Транзакции хранятся в кеше кортежами.
         """
-        transactions: List[List[Union[str, float]]] = []
+        self.flush()
+        stamp = self._file_stamp()
+        if self._cache is not None and stamp == self._stamp:
+            return self._cache
         with open(self.filename, newline="", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                transactions.append(row)
+            transactions = list(map(tuple, _csv.reader(file)))
+        self._cache = transactions
+        self._offsets = None
+        self._stamp = stamp
         return transactions
 
+    def _row_offsets(self) -> List[int]:
+        """Возвращает смещения начала каждой записи в файле (в байтах).
+
+        Смещения нужны только для редактирования записей на месте,
+        поэтому считаются одним проходом по файлу при первом обращении.
+        Здесь всегда используется стандартный csv: смещения вычисляются
+        по reader.line_num, который есть не у всех реализаций.
+        Последний элемент списка - конец последней записи.
+        """
+        if self._offsets is None:
+            line_ends = [0]
+            with open(self.filename, "rb") as file:
+
+                def read_lines():
+                    for line in file:
+                        line_ends.append(line_ends[-1] + len(line))
+                        yield line.decode("utf-8")
+
+                reader = csv.reader(read_lines())
+                self._offsets = [0]
+                for _ in reader:
+                    self._offsets.append(line_ends[reader.line_num])
+        return self._offsets
+
     def save_transactions(
         self, transactions: List[List[Union[str, float]]]
     ) -> None:
@@ -88,106 +213,323 @@ class AccountManager:
         Args:
         transactions: Принимает список списков с данными о транзакциях.
         """
-        with open(self.filename, "w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerows(transactions)
+        self.flush()
+        lines = [self._serialize_row(row) for row in transactions]
+        with open(self.filename, "wb") as file:
+            file.write(b"".join(lines))
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+        self._cache = [
+            tuple("" if value is None else str(value) for value in row)
+            for row in transactions
+        ]
+        self._offsets = offsets
+        self._stamp = self._file_stamp()
+        self._totals = None
+        self._date_index = None
 
     def add_transaction(self, transaction: Transaction) -> None:
         """Добавляет данные о транзакции в файл.
 
+        При batch_size больше 1 транзакции копятся в памяти
+        и записываются в файл пачкой, когда их набирается batch_size,
+        перед любым чтением файла, при удалении объекта или при
+        завершении программы.
+
         Args:
             transaction (Transaction): Объект транзакции для добавления.
         """
-        with open(self.filename, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(
-                [
-                    transaction.date,
-                    transaction.category,
-                    transaction.amount,
-                    transaction.description,
-                ]
-            )
+        self._pending.append(
+            [
+                transaction.date,
+                transaction.category,
+                str(transaction.amount),
+                transaction.description,
+            ]
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Записывает в файл накопленные транзакции."""
+        if not self._pending:
+            return
+        rows = list(map(tuple, self._pending))
+        cache_is_fresh = self._is_cache_fresh()
+        lines = self._write_pending(self.filename, self._pending)
+        if cache_is_fresh:
+            self._cache.extend(rows)
+            if self._offsets is not None:
+                for line in lines:
+                    self._offsets.append(self._offsets[-1] + len(line))
+            self._stamp = self._file_stamp()
+        else:
+            self._cache = None
+        self._totals = None
+        self._date_index = None
+
+    @classmethod
+    def _write_pending(
+        cls, filename: str, pending: List[List[str]]
+    ) -> List[bytes]:
+        """Дописывает накопленные транзакции в файл и очищает список.
+
+        Не обращается к объекту AccountManager, поэтому может вызываться
+        из weakref.finalize после его удаления.
+
+        Returns:
+            Записанные строки CSV-файла в виде байтов.
+        """
+        lines = [cls._serialize_row(row) for row in pending]
+        if lines:
+            with open(filename, "ab") as file:
+                file.write(b"".join(lines))
+            pending.clear()
+        return lines
 
     def edit_transaction(
         self,
         transaction_index: int,
         new_transaction_data: List[Union[str, float]],
     ) -> None:
-        """Редактирует существующую транзакцию."""
-        transactions = self.load_transactions()
-        transactions[transaction_index - 1] = new_transaction_data
-        self.save_transactions(transactions)
+        """Редактирует существующую транзакцию.
+
+        Если новая запись занимает в файле столько же байт, сколько
+        старая, она перезаписывается на месте, иначе файл сохраняется
+        целиком.
+        """
+        transactions = self._load_rows()
+        index = range(len(transactions))[transaction_index - 1]
+        offsets = self._row_offsets()
+        start, end = offsets[index], offsets[index + 1]
+        with open(self.filename, "r+b") as file:
+            file.seek(start)
+            old_line = file.read(end - start)
+            lineterminator = old_line[len(old_line.rstrip(b"\r\n")) :]
+            new_line = self._serialize_row(
+                new_transaction_data, lineterminator.decode("utf-8")
+            )
+            if len(new_line) == len(old_line):
+                file.seek(start)
+                file.write(new_line)
+        if len(new_line) != len(old_line):
+            transactions = list(transactions)
+            transactions[index] = new_transaction_data
+            self.save_transactions(transactions)
+            return
+        transactions[index] = tuple(
+            "" if value is None else str(value)
+            for value in new_transaction_data
+        )
+        self._stamp = self._file_stamp()
+        self._totals = None
+        self._date_index = None
 
     def search_transactions(
         self, criteria: Dict[str, Union[str, float]]
-    ) -> Union[List[List[Union[str, float]]], None]:
-        """Поиск транзакций по критериям."""
-        transactions = self.load_transactions()
-        result = []
-        for transaction in transactions:
-            match = True
-            for key, value in criteria.items():
-                if key == "date" and transaction[0] != value:
-                    match = False
-                    break
-                if key == "category" and transaction[1] != value:
-                    match = False
-                    break
-                if key == "amount" and transaction[2] != value:
-                    match = False
-                    break
-            if match:
-                result.append(transaction)
+    ) -> Iterator[Tuple[str, ...]]:
+        """Поиск транзакций по критериям.
+
+        Возвращает итератор, найденные транзакции отбираются по мере
+        перебора результата. Итератор работает со снимком данных
+        на момент вызова, поэтому последующие изменения его не затронут.
+
+        Для каждого набора столбцов один раз генерируется функция
+        проверки транзакции, которая затем кешируется.
+        Поиск только по дате выполняется по отсортированному индексу дат,
+        а при неактуальном кеше и отсутствии кавычек в файле - прямо
+        по байтам файла, без разбора всех строк. Такой поиск делается
+        не больше одного раза для одной версии файла: повторный поиск
+        загружает кеш и дальше использует индекс.
+        """
+        if set(criteria) == {"date"}:
+            date = str(criteria["date"])
+            self.flush()
+            stamp = self._file_stamp()
+            if not self._is_cache_fresh() and stamp != self._scanned_stamp:
+                self._scanned_stamp = stamp
+                result = self._search_date_in_file(date)
+                if result is not None:
+                    return iter(result)
+            transactions = self._load_rows()
+            dates, order = self._get_date_index()
+            start = bisect_left(dates, date)
+            end = bisect_right(dates, date)
+            return iter([transactions[i] for i in order[start:end]])
+        transactions = list(self._load_rows())
+        pairs = sorted(
+            (SEARCH_COLUMNS[key], value)
+            for key, value in criteria.items()
+            if key in SEARCH_COLUMNS
+        )
+        if not pairs:
+            return iter(transactions)
+        indexes = tuple(index for index, _ in pairs)
+        make_predicate = self._pred_cache.get(indexes)
+        if make_predicate is None:
+            make_predicate = self._compile_predicate(indexes)
+            self._pred_cache[indexes] = make_predicate
+        predicate = make_predicate(*(value for _, value in pairs))
+        return filter(predicate, transactions)
+
+    @staticmethod
+    def _compile_predicate(
+        indexes: Tuple[int, ...],
+    ) -> Callable[..., Callable[[Tuple[str, ...]], bool]]:
+        """Генерирует фабрику функций проверки транзакции.
+
+        Для набора столбцов через eval собирается функция вида
+        ``lambda v0, v1: lambda r: r[0] == v0 and r[2] == v1``.
+        Искомые значения передаются ей аргументами, поэтому фабрика
+        не зависит от значений и компилируется один раз на набор
+        столбцов, а пользовательский ввод не попадает в исходный код.
+
+        Args:
+            indexes: Номера столбцов, по которым идет поиск.
+
+        Returns:
+            Функция, которая принимает искомые значения и возвращает
+            функцию, возвращающую True для подходящей транзакции.
+        """
+        names = [f"v{number}" for number in range(len(indexes))]
+        conditions = [
+            f"r[{index}] == {name}" for index, name in zip(indexes, names)
+        ]
+        return eval(
+            f"lambda {', '.join(names)}: lambda r: {' and '.join(conditions)}"
+        )
+
+    def _get_date_index(self) -> Tuple[List[str], List[int]]:
+        """Возвращает индекс транзакций, отсортированный по дате.
+
+        Индекс строится при первом обращении и кешируется до следующего
+        изменения файла.
+
+        Returns:
+            Кортеж (отсортированные даты, номера соответствующих строк).
+        """
+        transactions = self._load_rows()
+        if (
+            self._date_index is not None
+            and self._date_index_stamp == self._stamp
+        ):
+            return self._date_index
+        order = sorted(
+            range(len(transactions)), key=lambda i: transactions[i][0]
+        )
+        dates = [transactions[i][0] for i in order]
+        self._date_index = (dates, order)
+        self._date_index_stamp = self._stamp
+        return self._date_index
+
+    def _search_date_in_file(
+        self, date: str
+    ) -> Optional[List[Tuple[str, ...]]]:
+        """Ищет в файле строки, начинающиеся с указанной даты.
+
+        Строки ищутся по байтам без разбора CSV, поэтому поиск возможен,
+        только если в файле нет кавычек: иначе совпадение может оказаться
+        внутри многострочного поля.
+
+        Args:
+            date: Дата в формате 'гггг-мм-дд'.
+
+        Returns:
+            Список списков с данными о найденных транзакциях
+            или None, если в файле есть поля в кавычках.
+        """
+        prefix = f"{date},".encode("utf-8")
+        needle = b"\n" + prefix
+        result: List[Tuple[str, ...]] = []
+        with open(self.filename, "rb") as file:
+            if not os.fstat(file.fileno()).st_size:
+                return result
+            with mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                if mapped.find(b'"') != -1:
+                    return None
+                starts = [0] if mapped[: len(prefix)] == prefix else []
+                index = mapped.find(needle)
+                while index != -1:
+                    starts.append(index + 1)
+                    index = mapped.find(needle, index + 1)
+                for start in starts:
+                    end = mapped.find(b"\n", start)
+                    line = mapped[start : end if end != -1 else len(mapped)]
+                    result.extend(
+                        map(tuple, _csv.reader([line.decode("utf-8")]))
+                    )
         return result
 
-    def show_balance(self) -> float:
-        """Выводит баланс счета.
+    def _aggregate(
+        self,
+    ) -> Tuple[
+        List[Tuple[str, ...]],
+        int,
+        List[Tuple[str, ...]],
+        int,
+        int,
+    ]:
+        """Считает расходы, доходы и баланс за один проход по транзакциям.
+
+        Суммы хранятся в целых рублях (см. AMOUNT_PATTERN), поэтому
+        считаются через int. Результат кешируется до следующего
+        изменения файла.
 
         Returns:
-            Баланс счета, рассчитанный на основе доходов и расходов.
+            Кортеж (расходы, сумма расходов, доходы, сумма доходов, баланс).
         """
-        transactions = self.load_transactions()
-        balance = 0
+        transactions = self._load_rows()
+        if self._totals is not None and self._totals_stamp == self._stamp:
+            return self._totals
+        transactions_expenses = []
+        transactions_profit = []
+        expenses = 0
+        profit = 0
         for transaction in transactions:
-            amount = float(transaction[2])
             if transaction[1] == "Доход":
-                balance += amount
+                profit += int(transaction[2])
+                transactions_profit.append(transaction)
             elif transaction[1] == "Расход":
-                balance -= amount
-        return balance
+                expenses += int(transaction[2])
+                transactions_expenses.append(transaction)
+        self._totals = (
+            transactions_expenses,
+            expenses,
+            transactions_profit,
+            profit,
+            profit - expenses,
+        )
+        self._totals_stamp = self._stamp
+        return self._totals
+
+    def show_balance(self) -> int:
+        """Выводит баланс счета.
+
+        Returns:
+            Баланс счета, рассчитанный на основе доходов и расходов.
+        """
+        return self._aggregate()[4]
 
-    def show_expenses(self) -> Tuple[List[List[Union[str, float]]], float]:
+    def show_expenses(self) -> Tuple[List[Tuple[str, ...]], int]:
         """Показывает все расходы.
 
         Returns:
-            Список списков с данными о расходах и общую сумму расходов.
+            Список кортежей с данными о расходах и общую сумму расходов.
         """
-        transactions = self.load_transactions()
-        expenses = 0
-        transactions_expenses = []
-        for transaction in transactions:
-            if transaction[1] == "Расход":
-                amount = float(transaction[2])
-                expenses += amount
-                transactions_expenses.append(transaction)
-        return transactions_expenses, expenses
+        transactions_expenses, expenses, _, _, _ = self._aggregate()
+        return list(transactions_expenses), expenses
 
-    def show_profit(self) -> Tuple[List[List[Union[str, float]]], float]:
+    def show_profit(self) -> Tuple[List[Tuple[str, ...]], int]:
         """Показывает все доходы.
 
         Returns:
-            Список списков с данными о доходах и общую сумму доходов.
+            Список кортежей с данными о доходах и общую сумму доходов.
         """
-        transactions = self.load_transactions()
-        profit = 0
-        transactions_profit = []
-        for transaction in transactions:
-            if transaction[1] == "Доход":
-                amount = float(transaction[2])
-                profit += amount
-                transactions_profit.append(transaction)
-        return transactions_profit, profit
+        _, _, transactions_profit, profit, _ = self._aggregate()
+        return list(transactions_profit), profit
 
     def check_transaction_number_input(
         self, transaction_number: str, len_transactions: int
@@ -215,7 +557,7 @@ class AccountManager:
         """
         while True:
             date_input = input("Введите дату в формате гггг-мм-дд: ")
-            if DATE_PATTERN.match(date_input):
+            if _date_fullmatch(date_input):
                 return date_input
             print(
                 "Неправильный формат даты. Например - "
@@ -233,7 +575,7 @@ class AccountManager:
         """
         while True:
             amount_input = input(f"{category}. Введите сумму (в рублях): ")
-            if AMOUNT_PATTERN.match(amount_input):
+            if _amount_fullmatch(amount_input):
                 return int(amount_input)
             print("Неправильный формат суммы. Только цифры!")
 
@@ -270,7 +612,7 @@ if __name__ == "__main__":
                     print("---")
                     print("Все расходы:")
                     for transaction in transactions:
-                        print(transaction)
+                        print(list(transaction))
                     print(f"Общая сумма расходов: {expenses} руб.")
                     print("---")
                     break
@@ -279,7 +621,7 @@ if __name__ == "__main__":
                     print("---")
                     print("Все доходы:")
                     for transaction in transactions:
-                        print(transaction)
+                        print(list(transaction))
                     print(f"Общая сумма доходов: {profit} руб.")
                     print("---")
                     break
@@ -314,7 +656,7 @@ if __name__ == "__main__":
             len_transactions = len(transactions)
             print("Список всех транзакций:")
             for index, transaction in enumerate(transactions):
-                print(f"{index+1}. {transaction}")
+                print(f"{index+1}. {list(transaction)}")
             while True:
                 transaction_number_input = input(
                     "Введите номер записи, которую хотите отредактировать: "
@@ -370,7 +712,7 @@ if __name__ == "__main__":
             print("---")
             print("Результаты поиска:")
             for transaction in search_result:
-                print(transaction)
+                print(list(transaction))
             print("---")
 
         elif command == 5:
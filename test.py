@@ -1,5 +1,9 @@
+import csv
+import gc
 import os
 import unittest
+import weakref
+from unittest import mock
 
 from main import AccountManager, Transaction
 
@@ -10,7 +14,8 @@ class TestAccountManager(unittest.TestCase):
         self.account_manager = AccountManager(self.filename)
 
     def tearDown(self):
-        os.remove(self.filename)
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
 
     def test_add_transaction(self):
         test_transaction = Transaction(
@@ -53,6 +58,321 @@ class TestAccountManager(unittest.TestCase):
         self.assertEqual(int(edited_transaction[2]), 700)
         self.assertEqual(edited_transaction[3], "Новое описание")
 
+    def test_add_transaction_is_written_immediately(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 1000, "Первая")
+        )
+
+        self.assertEqual(
+            len(AccountManager(self.filename).load_transactions()), 1
+        )
+
+    def test_add_transaction_is_batched(self):
+        account_manager = AccountManager(self.filename, batch_size=2)
+
+        account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 1000, "Первая")
+        )
+        self.assertFalse(os.path.exists(self.filename))
+
+        account_manager.add_transaction(
+            Transaction("2024-05-02", "Расход", 500, "Вторая")
+        )
+        with open(self.filename, newline="", encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_batched_transactions_are_written_on_delete(self):
+        account_manager = AccountManager(self.filename, batch_size=10)
+        account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 1000, "Первая")
+        )
+        manager_ref = weakref.ref(account_manager)
+
+        del account_manager
+        gc.collect()
+
+        self.assertIsNone(manager_ref())
+        self.assertEqual(
+            len(AccountManager(self.filename).load_transactions()), 1
+        )
+
+    def test_edit_transaction_keeps_other_rows(self):
+        for day, description in (("01", "Первая"), ("02", "Вторая")):
+            self.account_manager.add_transaction(
+                Transaction(f"2024-05-{day}", "Доход", 100, description)
+            )
+
+        self.account_manager.edit_transaction(
+            1, ["2024-05-03", "Доход", 200, "Первая"]
+        )
+        self.account_manager.edit_transaction(
+            2, ["2024-05-04", "Расход", 50, "Вторая, длиннее"]
+        )
+
+        with open(self.filename, newline="", encoding="utf-8") as file:
+            content = file.read()
+        self.assertEqual(
+            content,
+            "2024-05-03,Доход,200,Первая\r\n"
+            '2024-05-04,Расход,50,"Вторая, длиннее"\r\n',
+        )
+        self.assertEqual(
+            self.account_manager.load_transactions()[1][3], "Вторая, длиннее"
+        )
+        self.assertEqual(self.account_manager.show_balance(), 150)
+
+    def test_edit_transaction_after_multiline_description(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 100, "Первая\nстрока")
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-02", "Доход", 100, "Вторая")
+        )
+
+        self.account_manager.edit_transaction(
+            2, ["2024-05-02", "Доход", 200, "Вторая"]
+        )
+
+        self.assertEqual(
+            AccountManager(self.filename).load_transactions(),
+            [
+                ("2024-05-01", "Доход", "100", "Первая\nстрока"),
+                ("2024-05-02", "Доход", "200", "Вторая"),
+            ],
+        )
+
+    def test_save_transactions_writes_none_as_empty_field(self):
+        self.account_manager.save_transactions(
+            [["2024-05-01", "Доход", 100, None]]
+        )
+
+        with open(self.filename, newline="", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "2024-05-01,Доход,100,\r\n")
+        self.assertEqual(
+            self.account_manager.load_transactions(),
+            AccountManager(self.filename).load_transactions(),
+        )
+
+    def test_search_transactions(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 1000, "Зарплата")
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Расход", 300, "Продукты")
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-02", "Расход", 300, "Транспорт")
+        )
+
+        by_date = list(
+            self.account_manager.search_transactions({"date": "2024-05-01"})
+        )
+        by_category_and_amount = list(
+            self.account_manager.search_transactions(
+                {"category": "Расход", "amount": "300"}
+            )
+        )
+
+        self.assertEqual([t[3] for t in by_date], ["Зарплата", "Продукты"])
+        self.assertEqual(
+            list(
+                AccountManager(self.filename).search_transactions(
+                    {"date": "2024-05-01"}
+                )
+            ),
+            by_date,
+        )
+        self.account_manager.load_transactions()
+        self.assertEqual(
+            list(
+                self.account_manager.search_transactions(
+                    {"date": "2024-05-01"}
+                )
+            ),
+            by_date,
+        )
+        self.assertEqual(
+            list(
+                self.account_manager.search_transactions(
+                    {"date": "2024-05-03"}
+                )
+            ),
+            [],
+        )
+        self.assertEqual(
+            [t[3] for t in by_category_and_amount], ["Продукты", "Транспорт"]
+        )
+
+    def test_search_by_date_with_multiline_description(self):
+        for date, description in (
+            ("2024-05-01", "line1\n2024-05-01,fake"),
+            ("2024-05-02", "Обычная"),
+            ("2024-05-01", "multi\nline"),
+        ):
+            self.account_manager.add_transaction(
+                Transaction(date, "Расход", 7, description)
+            )
+        expected = [
+            ("2024-05-01", "Расход", "7", "line1\n2024-05-01,fake"),
+            ("2024-05-01", "Расход", "7", "multi\nline"),
+        ]
+
+        cold = AccountManager(self.filename).search_transactions(
+            {"date": "2024-05-01"}
+        )
+        self.assertEqual(list(cold), expected)
+        self.account_manager.load_transactions()
+        warm = self.account_manager.search_transactions({"date": "2024-05-01"})
+        self.assertEqual(list(warm), expected)
+
+    def test_search_predicates_are_cached_per_columns(self):
+        for amount in (100, 200, 300):
+            self.account_manager.add_transaction(
+                Transaction("2024-05-01", "Расход", amount, "Описание")
+            )
+
+        for amount in ("100", "200", "300", "400"):
+            result = self.account_manager.search_transactions(
+                {"amount": amount, "category": "Расход"}
+            )
+            self.assertEqual(len(list(result)), int(amount != "400"))
+
+        self.assertEqual(len(self.account_manager._pred_cache), 1)
+
+    def test_repeated_cold_date_search_loads_cache(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 100, "Описание")
+        )
+        account_manager = AccountManager(self.filename)
+
+        for _ in range(2):
+            result = account_manager.search_transactions(
+                {"date": "2024-05-01"}
+            )
+            self.assertEqual(len(list(result)), 1)
+
+        self.assertTrue(account_manager._is_cache_fresh())
+
+    def test_search_by_non_string_date(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 100, "Описание")
+        )
+
+        account_manager = AccountManager(self.filename)
+        cold = account_manager.search_transactions({"date": None})
+        self.account_manager.load_transactions()
+        warm = self.account_manager.search_transactions({"date": None})
+
+        self.assertEqual(list(cold), [])
+        self.assertEqual(list(warm), [])
+
+    def test_search_result_is_a_snapshot(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Расход", 100, "Первая")
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-02", "Расход", 200, "Вторая")
+        )
+        self.account_manager.load_transactions()
+
+        by_date = self.account_manager.search_transactions(
+            {"date": "2024-05-01"}
+        )
+        by_category = self.account_manager.search_transactions(
+            {"category": "Расход"}
+        )
+        self.account_manager.edit_transaction(
+            1, ["2024-05-09", "Расход", 300, "Первая"]
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-03", "Расход", 400, "Третья")
+        )
+
+        self.assertEqual(
+            list(by_date), [("2024-05-01", "Расход", "100", "Первая")]
+        )
+        self.assertEqual([t[3] for t in by_category], ["Первая", "Вторая"])
+
+    def test_show_balance_expenses_profit(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 1000, "Зарплата")
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-02", "Расход", 300, "Продукты")
+        )
+        self.assertEqual(self.account_manager.show_balance(), 700)
+
+        self.account_manager.add_transaction(
+            Transaction("2024-05-03", "Расход", 200, "Транспорт")
+        )
+
+        self.assertEqual(self.account_manager.show_balance(), 500)
+        expenses, expenses_sum = self.account_manager.show_expenses()
+        self.assertEqual(len(expenses), 2)
+        self.assertEqual(expenses_sum, 500)
+        profit, profit_sum = self.account_manager.show_profit()
+        self.assertEqual(len(profit), 1)
+        self.assertEqual(profit_sum, 1000)
+
+    def test_load_transactions_reloads_changed_file(self):
+        test_transaction = Transaction(
+            "2024-05-01", "Доход", 1000, "Тестовое описание"
+        )
+        self.account_manager.add_transaction(test_transaction)
+        self.assertEqual(len(self.account_manager.load_transactions()), 1)
+
+        with open(self.filename, "a", newline="", encoding="utf-8") as file:
+            file.write("2024-05-02,Расход,500,Внешняя запись\n")
+
+        transactions = self.account_manager.load_transactions()
+
+        self.assertEqual(len(transactions), 2)
+        self.assertEqual(transactions[1][3], "Внешняя запись")
+
+    def test_load_transactions_cannot_change_cache(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 10, "Тестовое описание")
+        )
+
+        transactions = self.account_manager.load_transactions()
+        with self.assertRaises(TypeError):
+            transactions[0][2] = "999"
+        transactions.clear()
+        self.account_manager.show_profit()[0].clear()
+
+        self.assertEqual(self.account_manager.show_balance(), 10)
+
+    def test_load_transactions_matches_stdlib_csv(self):
+        self.account_manager.add_transaction(
+            Transaction("2024-05-01", "Доход", 100, 'Описание, "в кавычках"')
+        )
+        self.account_manager.add_transaction(
+            Transaction("2024-05-02", "Расход", 50, "Две\nстроки")
+        )
+
+        with open(self.filename, newline="", encoding="utf-8") as file:
+            expected = list(map(tuple, csv.reader(file)))
+
+        self.assertEqual(
+            AccountManager(self.filename).load_transactions(), expected
+        )
+
+    def test_check_date_input(self):
+        inputs = ["2024-13-01", "2024-05-011", "2024-05-01"]
+        with mock.patch("builtins.input", side_effect=inputs), mock.patch(
+            "builtins.print"
+        ):
+            date = self.account_manager.check_date_input()
+        self.assertEqual(date, "2024-05-01")
+
+    def test_check_amount_input(self):
+        inputs = ["10.5", "10\n", "", "105"]
+        with mock.patch("builtins.input", side_effect=inputs), mock.patch(
+            "builtins.print"
+        ):
+            amount = self.account_manager.check_amount_input("Доход")
+        self.assertEqual(amount, 105)
+
 
 if __name__ == "__main__":
     unittest.main()